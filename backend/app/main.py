@@ -1,19 +1,28 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict
+import json
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from backend.agents.stock_agent import graph, saver
-from backend.db.db import get_db, release_db, init_db
+from backend.db.db import get_async_pool, open_async_pool, init_db
 from backend.ingestion.tool import fetch_stock_dashboard_data, predict_stock_signal
 from backend.trading.broker import get_account_info, get_positions, get_recent_orders
 from fastapi.middleware.cors import CORSMiddleware
 import uuid
 from langgraph.checkpoint.postgres import PostgresSaver
+from backend.logging_utils import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     import psycopg
     import os
 
@@ -21,29 +30,68 @@ def startup_event():
     try:
         init_db()
     except Exception as e:
-        print(f"[DB] Warning: init_db failed ({e}), will retry on first request.")
+        logger.warning(f"[DB] Warning: init_db failed ({e}), will retry on first request.")
+
+    try:
+        await open_async_pool()
+        logger.info("[DB] Async connection pool opened.")
+    except Exception as e:
+        logger.warning(f"[DB] Warning: async pool open failed ({e}).")
 
     db_url = os.getenv("DATABASE_URL", "").strip()
     if not db_url:
-        print("[DB] Warning: DATABASE_URL not set, skipping PostgresSaver setup.")
+        logger.warning("[DB] Warning: DATABASE_URL not set, skipping PostgresSaver setup.")
         return
 
     conninfo = db_url if "sslmode" in db_url else db_url + "?sslmode=require"
     try:
         with psycopg.connect(conninfo, autocommit=True, connect_timeout=10) as conn:
-            setup_saver = PostgresSaver(conn)
-            setup_saver.setup()
-            print("[DB] PostgresSaver tables ensured (autocommit).")
+            # Fast path: setup() runs migrations inside a lock; skip it
+            # entirely when the checkpoint tables already exist
+            exists = conn.execute("SELECT to_regclass('checkpoints')").fetchone()
+            if exists and exists[0]:
+                logger.info("[DB] PostgresSaver tables already present, skipping setup.")
+            else:
+                setup_saver = PostgresSaver(conn)
+                setup_saver.setup()
+                logger.info("[DB] PostgresSaver tables ensured (autocommit).")
     except Exception as e:
-        print(f"[DB] Warning: PostgresSaver setup failed: {e}")
+        logger.warning(f"[DB] Warning: PostgresSaver setup failed: {e}")
         try:
             if saver:
-                saver.setup()
-                print("[DB] PostgresSaver tables ensured (fallback).")
+                await saver.asetup()
+                logger.info("[DB] PostgresSaver tables ensured (fallback).")
         except Exception as e2:
-            print(f"[DB] Warning: Persistent storage setup failed: {e2}")
+            logger.warning(f"[DB] Warning: Persistent storage setup failed: {e2}")
+
+    # Prime the checkpointer read path (prepared plans, pool connections)
+    # so the first real /analyze doesn't pay the cold-start penalty. A
+    # state read exercises the same plumbing as a run without spending
+    # LLM quota on a warm-up prompt.
+    try:
+        await graph.aget_state({"configurable": {"thread_id": "__warmup__"}})
+        logger.info("[STARTUP] Checkpointer warmed.")
+    except Exception as e:
+        logger.warning(f"[STARTUP] Warning: checkpointer warm-up failed: {e}")
+
+    from backend.ingestion.warmup import warm_cache_loop
+    app.state.warm_task = asyncio.create_task(warm_cache_loop())
+
+    logger.info("[STARTUP] App ready.")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from backend.ingestion.http import close_session
+
+    warm_task = getattr(app.state, "warm_task", None)
+    if warm_task is not None:
+        warm_task.cancel()
+
+    try:
+        await close_session()
+    except Exception as e:
+        logger.warning(f"[SHUTDOWN] Warning: HTTP session close failed: {e}")
 
-    print("[STARTUP] App ready.")
 
 app.add_middleware(
     CORSMiddleware,
@@ -58,117 +106,137 @@ class StockRequest(BaseModel):
     thread_id: Optional[str] = None
 
 @app.get("/threads")
-def get_threads():
-    conn = get_db()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id, title, updated_at FROM threads ORDER BY updated_at DESC")
-            return cur.fetchall()
-    finally:
-        release_db(conn)
+async def get_threads():
+    async with get_async_pool().connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT id, title, updated_at FROM threads ORDER BY updated_at DESC",
+                prepare=True,
+            )
+            return await cur.fetchall()
+
+
+# Messages tagged with these roles at production time never reach the frontend
+INTERNAL_ROLES = frozenset({"tool_call", "observation", "system_notice"})
+
+# Prefixes marking internal HumanMessages in legacy (pre-tagging) threads;
+# str.startswith takes the tuple directly, one call instead of three
+_INTERNAL_PREFIXES = ("Observation from", "SYSTEM NOTICE", "SYSTEM ERROR")
 
 
 def filter_messages(messages):
-    """Return only user/assistant chat messages for frontend display."""
+    """
+    Return only user/assistant chat messages for frontend display.
+    Runs on every /analyze and thread-history read, so the loop body is
+    kept lean: locals are bound once outside the loop and per-message work
+    is a couple of dict/attribute lookups on the tagged fast path.
+    """
     filtered = []
+    append = filtered.append
+    empty_kwargs = {}
+
     for msg in messages:
-        raw_content = getattr(msg, "content", "")
+        raw_content = msg.content
         if isinstance(raw_content, list):
-            text_parts = []
-            for part in raw_content:
-                if isinstance(part, dict):
-                    text_parts.append(part.get("text", ""))
-                else:
-                    text_parts.append(str(part))
-            text_content = "".join(text_parts)
+            text_content = "".join(
+                part.get("text", "") if isinstance(part, dict) else str(part)
+                for part in raw_content
+            )
         else:
             text_content = str(raw_content) if raw_content else ""
 
         clean_content = text_content.strip()
 
-        if isinstance(msg, ToolMessage):
+        # Fast path: messages produced since role tagging landed carry a
+        # quantpilot_role flag — one dict lookup replaces the content sniffing
+        role_tag = getattr(msg, "additional_kwargs", empty_kwargs).get("quantpilot_role")
+        if role_tag is not None:
+            if role_tag in INTERNAL_ROLES:
+                continue
+            append({
+                "role": "user" if isinstance(msg, HumanMessage) else "assistant",
+                "content": clean_content,
+            })
             continue
 
-        if isinstance(msg, AIMessage) and hasattr(msg, 'tool_calls') and msg.tool_calls and not clean_content:
+        # Legacy path for untagged messages restored from older checkpoints
+        if isinstance(msg, ToolMessage):
             continue
 
-        is_internal_human = isinstance(msg, HumanMessage) and (
-            clean_content.startswith("Observation from") or
-            clean_content.startswith("SYSTEM NOTICE") or
-            clean_content.startswith("SYSTEM ERROR")
-        )
+        if isinstance(msg, AIMessage) and msg.tool_calls and not clean_content:
+            continue
 
-        if not is_internal_human:
-            role = "user" if isinstance(msg, HumanMessage) else "assistant"
-            filtered.append({"role": role, "content": clean_content})
+        if isinstance(msg, HumanMessage):
+            if clean_content.startswith(_INTERNAL_PREFIXES):
+                continue
+            append({"role": "user", "content": clean_content})
+        else:
+            append({"role": "assistant", "content": clean_content})
 
     return filtered
 
 # thread management endpoints
 @app.get("/threads/{thread_id}")
-def get_thread_history(thread_id: str):
+async def get_thread_history(thread_id: str):
     config = {"configurable": {"thread_id": thread_id}}
-    state = graph.get_state(config)
+    state = await graph.aget_state(config)
     messages = state.values.get("messages", [])
     return {"messages": filter_messages(messages)}
 
 @app.delete("/threads/{thread_id}")
-def delete_thread(thread_id: str):
-    conn = get_db()
+async def delete_thread(thread_id: str):
     try:
-        with conn.cursor() as cur:
-
-            cur.execute("DELETE FROM checkpoints WHERE thread_id = %s", (thread_id,))
-            cur.execute("DELETE FROM checkpoint_blobs WHERE thread_id = %s", (thread_id,))
-            cur.execute("DELETE FROM checkpoint_writes WHERE thread_id = %s", (thread_id,))
-
-            cur.execute("DELETE FROM threads WHERE id = %s", (thread_id,))
-            conn.commit()
-            return {"status": "success"}
+        async with get_async_pool().connection() as conn:
+            async with conn.cursor() as cur:
+                # One round trip for all four tables; prepare=True caches the plan
+                await cur.execute(
+                    """
+                    WITH d1 AS (DELETE FROM checkpoints WHERE thread_id = %s),
+                         d2 AS (DELETE FROM checkpoint_blobs WHERE thread_id = %s),
+                         d3 AS (DELETE FROM checkpoint_writes WHERE thread_id = %s)
+                    DELETE FROM threads WHERE id = %s
+                    """,
+                    (thread_id, thread_id, thread_id, thread_id),
+                    prepare=True,
+                )
+        return {"status": "success"}
     except Exception as e:
-        print(f"[ERROR] Failed to delete thread: {e}")
+        logger.error(f"[ERROR] Failed to delete thread: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        release_db(conn)
 
 
-def _upsert_thread(thread_id: str, query: str):
+async def _upsert_thread(thread_id: str, query: str):
     """Create or update thread metadata."""
-    conn = get_db()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT title FROM threads WHERE id = %s", (thread_id,))
-            row = cur.fetchone()
-            if not row:
-                title = query[:50] + ("..." if len(query) > 50 else "")
-                cur.execute(
-                    "INSERT INTO threads (id, title, updated_at) VALUES (%s, %s, CURRENT_TIMESTAMP)",
-                    (thread_id, title)
-                )
-            else:
-                cur.execute(
-                    "UPDATE threads SET updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                    (thread_id,)
-                )
-            conn.commit()
-    finally:
-        release_db(conn)
+    async with get_async_pool().connection() as conn:
+        async with conn.cursor() as cur:
+            # Single upsert instead of SELECT-then-INSERT/UPDATE; existing
+            # threads keep their title and only bump updated_at
+            title = query[:50] + ("..." if len(query) > 50 else "")
+            await cur.execute(
+                """
+                INSERT INTO threads (id, title, updated_at)
+                VALUES (%s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT (id) DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+                """,
+                (thread_id, title),
+                prepare=True,
+            )
 
 
 @app.post("/analyze")
-def analyze_stock(req: StockRequest):
+async def analyze_stock(req: StockRequest):
     """Non-streaming stock analysis endpoint."""
     thread_id = req.thread_id or str(uuid.uuid4())
-    print(f"\n[BACKEND] Received query: {req.query}")
-    print(f"[BACKEND] Thread ID: {thread_id}")
+    logger.info(f"[BACKEND] Received query: {req.query}")
+    logger.info(f"[BACKEND] Thread ID: {thread_id}")
 
-    _upsert_thread(thread_id, req.query)
+    await _upsert_thread(thread_id, req.query)
 
     config = {"configurable": {"thread_id": thread_id}}
 
     try:
-        result = graph.invoke({
-            "messages": [HumanMessage(content=req.query)],
+        result = await graph.ainvoke({
+            "messages": [HumanMessage(content=req.query, additional_kwargs={"quantpilot_role": "user"})],
             "loop_count": 0
         }, config=config)
 
@@ -185,7 +253,7 @@ def analyze_stock(req: StockRequest):
             "thread_id": thread_id
         }
     except Exception as e:
-        print(f"[ERROR] Backend processing failed: {e}")
+        logger.error(f"[ERROR] Backend processing failed: {e}")
         return {
             "response": f"I'm sorry, an error occurred: {str(e)}",
             "thread_id": thread_id
@@ -193,16 +261,53 @@ def analyze_stock(req: StockRequest):
 
 
 
+@app.post("/analyze/stream")
+async def analyze_stock_stream(req: StockRequest):
+    """
+    Streaming stock analysis endpoint (SSE).
+    Emits analyst tokens as they are generated instead of waiting for the
+    full multi-turn graph to finish — TTFB drops from total graph time to
+    the first LLM token.
+    """
+    thread_id = req.thread_id or str(uuid.uuid4())
+    logger.info(f"[BACKEND] Received streaming query: {req.query}")
+    logger.info(f"[BACKEND] Thread ID: {thread_id}")
+
+    await _upsert_thread(thread_id, req.query)
+
+    config = {"configurable": {"thread_id": thread_id}}
+
+    async def event_generator():
+        # First event carries the thread id so new conversations can be tracked
+        yield f"data: {json.dumps({'thread_id': thread_id})}\n\n"
+        try:
+            async for ev in graph.astream_events(
+                {"messages": [HumanMessage(content=req.query, additional_kwargs={"quantpilot_role": "user"})], "loop_count": 0},
+                config=config,
+                version="v2",
+            ):
+                if ev["event"] == "on_chat_model_stream":
+                    content = getattr(ev["data"]["chunk"], "content", "")
+                    if content:
+                        yield f"data: {json.dumps({'token': content})}\n\n"
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            logger.error(f"[ERROR] Streaming failed: {e}")
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
 @app.post("/agent/stock")
-def get_dashboard_data(req: Dict[str, str]):
+async def get_dashboard_data(req: Dict[str, str]):
     symbol = req.get("symbol")
     if not symbol:
         raise HTTPException(status_code=400, detail="Symbol is required")
 
     try:
-        return fetch_stock_dashboard_data(symbol)
+        return await fetch_stock_dashboard_data(symbol)
     except Exception as e:
-        print(f"[ERROR] Dashboard fetch failed: {e}")
+        logger.error(f"[ERROR] Dashboard fetch failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -212,7 +317,7 @@ def get_trading_account():
     try:
         return get_account_info()
     except Exception as e:
-        print(f"[ERROR] Trading account fetch failed: {e}")
+        logger.error(f"[ERROR] Trading account fetch failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -222,15 +327,15 @@ def get_trading_positions():
     try:
         return get_positions()
     except Exception as e:
-        print(f"[ERROR] Positions fetch failed: {e}")
+        logger.error(f"[ERROR] Positions fetch failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/trading/scan/{symbol}")
-def scan_chart_patterns(symbol: str):
+async def scan_chart_patterns(symbol: str):
     """Run technical-analysis scan and return BUY/SELL/HOLD signal."""
     try:
-        result = predict_stock_signal.invoke({"symbol": symbol})
+        result = await predict_stock_signal.ainvoke({"symbol": symbol})
 
         if result.get("error"):
             return {
@@ -250,7 +355,7 @@ def scan_chart_patterns(symbol: str):
             "timestamp": "generated_now"
         }
     except Exception as e:
-        print(f"[ERROR] Trading scan failed for {symbol}: {e}")
+        logger.error(f"[ERROR] Trading scan failed for {symbol}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -260,5 +365,5 @@ def get_trading_orders():
     try:
         return get_recent_orders(limit=10)
     except Exception as e:
-        print(f"[ERROR] Orders fetch failed: {e}")
+        logger.error(f"[ERROR] Orders fetch failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,23 +1,29 @@
+import logging
 import os
 import psycopg
-from psycopg_pool import ConnectionPool
+from psycopg_pool import ConnectionPool, AsyncConnectionPool
 from dotenv import load_dotenv
 from psycopg.rows import dict_row
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 _pool = None
+_apool = None
+
+
+def _conninfo():
+    db_url = os.getenv("DATABASE_URL", "").strip()
+    if not db_url:
+        raise RuntimeError("DATABASE_URL environment variable is not set!")
+    return db_url if "sslmode" in db_url else db_url + "?sslmode=require"
 
 
 def get_pool():
     global _pool
     if _pool is None:
-        db_url = os.getenv("DATABASE_URL", "").strip()
-        if not db_url:
-            raise RuntimeError("DATABASE_URL environment variable is not set!")
-        conninfo = db_url if "sslmode" in db_url else db_url + "?sslmode=require"
         _pool = ConnectionPool(
-            conninfo=conninfo,
+            conninfo=_conninfo(),
             min_size=0,
             max_size=5,
             timeout=30,
@@ -26,6 +32,31 @@ def get_pool():
     return _pool
 
 
+def get_async_pool():
+    """
+    Async pool for request handlers and the graph checkpointer.
+    Created closed (open=False) because no event loop runs at import time;
+    open_async_pool() is awaited from the FastAPI startup hook.
+    """
+    global _apool
+    if _apool is None:
+        _apool = AsyncConnectionPool(
+            conninfo=_conninfo(),
+            min_size=2,
+            max_size=10,
+            timeout=30,
+            open=False,
+            kwargs={"row_factory": dict_row},
+        )
+    return _apool
+
+
+async def open_async_pool():
+    # wait=True blocks until min_size connections are established, so the
+    # first request doesn't pay the TCP+TLS+auth cost of a cold pool
+    await get_async_pool().open(wait=True, timeout=30)
+
+
 def get_db():
     return get_pool().getconn()
 
@@ -44,8 +75,10 @@ def init_db():
                     title TEXT,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
+                CREATE INDEX IF NOT EXISTS threads_updated_at_idx
+                    ON threads (updated_at DESC);
             """)
             conn.commit()
-            print("[DB] Threads table initialized.")
+            logger.info("[DB] Threads table initialized.")
     finally:
         release_db(conn)
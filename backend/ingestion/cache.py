@@ -0,0 +1,184 @@
+"""Keyed TTL caching for tool results.
+
+Finnhub and AlphaVantage are rate-limited and dominate tool latency, yet the
+same ticker is often queried seconds apart (across loops, threads, and the
+dashboard). Caching results per (tool_name, args) with a per-tool TTL turns
+those repeats into dictionary lookups instead of API round trips.
+
+Long-lived entries (fundamentals, transcripts, income statements) are also
+persisted to disk so a process restart does not re-spend AlphaVantage's
+25-requests/day quota re-fetching data that is still fresh. Short-TTL
+entries (quotes, charts) stay memory-only — they expire before a restart
+could benefit and would just churn the filesystem.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per-tool TTLs in seconds. Quotes go stale in seconds; fundamentals and
+# historical reports barely move between earnings, so they can live for
+# hours or days. Broker/trading tools are deliberately absent — account
+# state, positions, and orders must never be served stale.
+TOOL_TTLS = {
+    "get_stock_price": 30,
+    "get_stock_price2": 300,
+    "get_stock_intraday_chart": 60,
+    "get_stock_news": 300,
+    "_company_news": 3600,  # shared wide Finnhub window behind both news tools
+    "get_stock_news2": 300,
+    "get_old_news": 3600,
+    "search_tool": 300,
+    "top_gainers": 300,
+    "company_overview": 24 * 3600,
+    "company_inside_news": 24 * 3600,
+    "annual_income_statement": 7 * 24 * 3600,
+    "earning_estimate": 24 * 3600,
+    "future_expected_earning": 24 * 3600,
+    "get_gold_price": 60,
+    "get_silver_price": 60,
+    "predict_stock_signal": 300,
+}
+
+MAX_ENTRIES = 512
+
+# Entries at or above this TTL survive restarts on disk
+DISK_TTL_THRESHOLD = 3600
+
+CACHE_DIR = Path(os.getenv("QUANTPILOT_CACHE_DIR", ".cache"))
+
+# key -> (expires_at, value)
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def cache_key(tool_name: str, args: Any) -> str:
+    """Stable key for one logical call: md5 of tool name + sorted args JSON."""
+    payload = json.dumps(args, sort_keys=True, default=str)
+    return hashlib.md5(f"{tool_name}:{payload}".encode()).hexdigest()
+
+
+def _disk_path(tool_name: str, key: str) -> Path:
+    return CACHE_DIR / tool_name / f"{key}.json"
+
+
+def _disk_get(tool_name: str, key: str) -> Optional[Any]:
+    """Read a persisted entry; returns None if absent, expired, or unreadable."""
+    path = _disk_path(tool_name, key)
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+        if time.time() - entry["fetched_at"] >= entry["ttl"]:
+            path.unlink(missing_ok=True)
+            return None
+        return entry["value"]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"[CACHE] Unreadable disk entry {path}: {e}")
+        return None
+
+
+def _disk_set(tool_name: str, key: str, ttl: int, value: Any) -> None:
+    """Persist an entry; disk is best-effort, failures only cost a re-fetch."""
+    path = _disk_path(tool_name, key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"fetched_at": time.time(), "ttl": ttl, "value": value}, f)
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning(f"[CACHE] Disk write failed for {tool_name}: {e}")
+
+
+def get_cached(tool_name: str, args: Any) -> Optional[Any]:
+    """Return the cached result for this call, or None if absent/expired."""
+    ttl = TOOL_TTLS.get(tool_name)
+    if ttl is None:
+        return None
+    key = cache_key(tool_name, args)
+    entry = _cache.get(key)
+    if entry is not None:
+        expires_at, value = entry
+        if time.monotonic() < expires_at:
+            return value
+        _cache.pop(key, None)
+    if ttl >= DISK_TTL_THRESHOLD:
+        value = _disk_get(tool_name, key)
+        if value is not None:
+            # Promote back into memory so the next hit skips the file read
+            _cache[key] = (time.monotonic() + ttl, value)
+            return value
+    return None
+
+
+def set_cached(tool_name: str, args: Any, value: Any) -> None:
+    """Store a successful tool result under its per-tool TTL."""
+    ttl = TOOL_TTLS.get(tool_name)
+    if ttl is None:
+        return
+    if len(_cache) >= MAX_ENTRIES:
+        _evict_expired()
+    key = cache_key(tool_name, args)
+    _cache[key] = (time.monotonic() + ttl, value)
+    if ttl >= DISK_TTL_THRESHOLD:
+        _disk_set(tool_name, key, ttl, value)
+
+
+# key -> Future for a fetch currently in flight (single-flight map)
+_inflight: Dict[str, "asyncio.Future"] = {}
+
+
+async def fetch_coalesced(tool_name: str, args: Any,
+                          fetcher: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Cache-then-fetch with single-flight semantics: concurrent callers for
+    the same (tool_name, args) share one network call instead of each
+    issuing their own — two dashboard widgets asking for AAPL at the same
+    instant cost one request against the API quota, not two.
+
+    Only cacheable tools are coalesced; side-effecting tools (trading)
+    are not in TOOL_TTLS and always execute their own call.
+    """
+    if tool_name not in TOOL_TTLS:
+        return await fetcher()
+
+    cached = get_cached(tool_name, args)
+    if cached is not None:
+        return cached
+
+    key = cache_key(tool_name, args)
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await pending
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await fetcher()
+        set_cached(tool_name, args, result)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved even with no waiters
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+def _evict_expired() -> None:
+    """Drop expired entries; if still full, drop the soonest-to-expire."""
+    now = time.monotonic()
+    for key in [k for k, (exp, _) in _cache.items() if exp <= now]:
+        _cache.pop(key, None)
+    while len(_cache) >= MAX_ENTRIES:
+        oldest = min(_cache, key=lambda k: _cache[k][0])
+        _cache.pop(oldest, None)
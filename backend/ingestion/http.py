@@ -0,0 +1,78 @@
+"""Shared HTTP plumbing for ingestion tools.
+
+Every tool used to call requests.get directly, opening a fresh TCP+TLS
+connection per call — for fast endpoints like quotes the handshake costs
+more than the payload. All tool HTTP now goes through one module-level
+aiohttp session whose connector keeps connections alive and pools them
+across tools and requests.
+"""
+
+import asyncio
+
+import aiohttp
+import orjson
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+_session = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Lazily create the shared session (needs a running event loop)."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            # Long keep-alive + DNS caching keep a warm connection (and a
+            # resolved address) ready across bursts of tool calls, so only
+            # the first call to each API host pays DNS + TCP + TLS setup
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                keepalive_timeout=75,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+            ),
+            timeout=aiohttp.ClientTimeout(total=10),
+            # br needs the brotli package; aiohttp decompresses transparently.
+            # The big AlphaVantage payloads compress 5-10x, cutting wire time.
+            headers={
+                "User-Agent": "QuantPilot/1.0",
+                "Accept-Encoding": "gzip, deflate, br",
+            },
+        )
+    return _session
+
+
+# Transient statuses worth retrying; auth errors (401/403) are permanent
+# and fall through to the normal response handling immediately
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@retry(
+    wait=wait_exponential(multiplier=0.5, max=8),
+    stop=stop_after_attempt(4),
+    retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
+    reraise=True,
+)
+async def get_json(url: str, **kwargs):
+    """
+    GET a URL through the shared session and decode the JSON body.
+    Transient failures (connection errors, timeouts, 429/5xx) are retried
+    with exponential backoff so a momentary rate-limit blip self-heals
+    instead of wasting a whole agent step.
+    """
+    async with get_session().get(url, **kwargs) as resp:
+        if resp.status in RETRY_STATUSES:
+            resp.raise_for_status()
+        # orjson parses the raw bytes directly — no bytes→str decode and
+        # several times faster than stdlib json on the large NEWS_SENTIMENT
+        # and INCOME_STATEMENT payloads. Also sidesteps aiohttp's
+        # content-type check (AlphaVantage sometimes serves JSON as text/html).
+        return orjson.loads(await resp.read())
+
+
+async def close_session():
+    """Close the shared session (called from the FastAPI shutdown hook)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -1,18 +1,67 @@
+import asyncio
+import functools
+import heapq
+import logging
 import os
-import requests
 from datetime import datetime, timedelta
+from backend.ingestion.cache import fetch_coalesced
+from backend.ingestion.http import get_json
 from dotenv import load_dotenv
 from langchain_core.tools import tool
 from langchain_community.tools import DuckDuckGoSearchRun
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-FINNHUB_KEY = os.getenv("FINNHUB_API_KEY")
-ALPHA_KEY = os.getenv("ALPHAADVANTAGE_API_KEY")
+
+# API keys are resolved lazily so importing this module does no .env disk
+# I/O — that matters for worker cold start, since nearly every backend
+# module imports the tools. lru_cache makes subsequent lookups free.
+@functools.lru_cache(maxsize=1)
+def _finnhub_key():
+    load_dotenv()
+    return os.getenv("FINNHUB_API_KEY")
+
+
+@functools.lru_cache(maxsize=1)
+def _alpha_key():
+    load_dotenv()
+    return os.getenv("ALPHAADVANTAGE_API_KEY")
+
+# Base endpoints; query strings are passed via params= so aiohttp builds
+# (and percent-encodes) the URL instead of per-call f-string assembly
+FINNHUB_QUOTE_URL = "https://finnhub.io/api/v1/quote"
+FINNHUB_NEWS_URL = "https://finnhub.io/api/v1/company-news"
+ALPHA_URL = "https://www.alphavantage.co/query"
+
+# Built once — the runner is stateless per query and constructing it sets
+# up its own HTTP client and parser internals
+_SEARCH = DuckDuckGoSearchRun(region="us-en")
+
+
+async def _alpha_get(**params):
+    """
+    Single entry point for AlphaVantage queries. Every cross-cutting
+    concern — shared session, retry/backoff, compression, orjson — applies
+    here once instead of being repeated in each of the twelve tools.
+    """
+    params["apikey"] = _alpha_key()
+    return await get_json(ALPHA_URL, params=params)
+
+
+def _num(value):
+    """
+    Convert an AlphaVantage numeric string to float. The API serves all
+    numbers as strings and uses "None"/"-" sentinels for missing data;
+    converting once here spares every downstream consumer a float() call.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
 @tool
-def get_stock_price(symbol: str):
+async def get_stock_price(symbol: str):
     """
     Retrieve the latest real-time stock quote for a given ticker symbol.
 
@@ -31,9 +80,9 @@ def get_stock_price(symbol: str):
         - prev_close → previous close
         - timestamp → quote time
     """
-    d = requests.get(
-        f"https://finnhub.io/api/v1/quote?symbol={symbol}&token={FINNHUB_KEY}"
-    ).json()
+    d = await get_json(
+        FINNHUB_QUOTE_URL, params={"symbol": symbol, "token": _finnhub_key()}
+    )
 
     return {
         "symbol": symbol,
@@ -46,8 +95,26 @@ def get_stock_price(symbol: str):
     }
 
 
+async def _fetch_company_news(symbol: str):
+    """
+    One wide Finnhub company-news window (4 years → today) shared by both
+    news tools. When the agent calls get_stock_news and get_old_news in
+    the same reasoning step — a common pattern — this costs one cached
+    network call instead of two overlapping ones.
+    """
+    async def _get():
+        today = datetime.now().strftime("%Y-%m-%d")
+        four_years_ago = (datetime.now() - timedelta(days=4 * 365)).strftime("%Y-%m-%d")
+        return await get_json(
+            FINNHUB_NEWS_URL,
+            params={"symbol": symbol, "from": four_years_ago, "to": today, "token": _finnhub_key()},
+        )
+
+    return await fetch_coalesced("_company_news", {"symbol": symbol}, _get)
+
+
 @tool
-def get_stock_news(symbol: str):
+async def get_stock_news(symbol: str):
     """
     Fetch the most recent news articles related to a stock symbol.
 
@@ -65,11 +132,8 @@ def get_stock_news(symbol: str):
         - url
         - publish time
     """
-    today = datetime.now().strftime("%Y-%m-%d")
-    one_month_ago = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-    data = requests.get(
-        f"https://finnhub.io/api/v1/company-news?symbol={symbol}&from={one_month_ago}&to={today}&token={FINNHUB_KEY}"
-    ).json()
+    data = await _fetch_company_news(symbol)
+    cutoff = (datetime.now() - timedelta(days=30)).timestamp()
 
     return [
         {
@@ -79,12 +143,13 @@ def get_stock_news(symbol: str):
             "url": n["url"],
             "time": n["datetime"],
         }
-        for n in data[:5]
-    ]
+        for n in data
+        if n["datetime"] >= cutoff
+    ][:5]
 
 
 @tool
-def get_old_news(symbol: str):
+async def get_old_news(symbol: str):
     """
     Fetch historical company news across a broader time range.
 
@@ -97,13 +162,13 @@ def get_old_news(symbol: str):
     Returns:
         List of 5 historical news records from Finnhub.
     """
-    today = datetime.now().strftime("%Y-%m-%d")
-    four_years_ago = (datetime.now() - timedelta(days=4*365)).strftime("%Y-%m-%d")
-    data = requests.get(
-        f"https://finnhub.io/api/v1/company-news?symbol={symbol}&from={four_years_ago}&to={today}&token={FINNHUB_KEY}"
-    ).json()
+    data = await _fetch_company_news(symbol)
+    cutoff = (datetime.now() - timedelta(days=30)).timestamp()
 
-    return data[:5]
+    # Slice out the items get_stock_news already covers so this tool
+    # actually surfaces background context rather than the same headlines
+    old = [n for n in data if n["datetime"] < cutoff]
+    return (old or data)[:5]
 
 
 @tool
@@ -120,12 +185,11 @@ def search_tool(query: str):
     Returns:
         Aggregated search summary text.
     """
-    search = DuckDuckGoSearchRun(region="us-en")
-    return search.run(query)
+    return _SEARCH.run(query)
 
 
 @tool
-def get_stock_price2(symbol: str):
+async def get_stock_price2(symbol: str):
     """
     Retrieve latest daily adjusted OHLCV stock data.
 
@@ -145,27 +209,27 @@ def get_stock_price2(symbol: str):
         - adjusted close
         - volume
     """
-    data = requests.get(
-        f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY_ADJUSTED&symbol={symbol}&apikey={ALPHA_KEY}"
-    ).json()
+    data = await _alpha_get(function="TIME_SERIES_DAILY_ADJUSTED", symbol=symbol)
 
     series = data["Time Series (Daily)"]
-    latest_date = sorted(series.keys(), reverse=True)[0]
+    # ISO dates sort lexically == chronologically; max() finds the newest
+    # in one pass instead of sorting the whole series for a single element
+    latest_date = max(series)
     latest = series[latest_date]
 
     return {
         "date": latest_date,
-        "open": latest["1. open"],
-        "high": latest["2. high"],
-        "low": latest["3. low"],
-        "close": latest["4. close"],
-        "adj_close": latest["5. adjusted close"],
-        "volume": latest["6. volume"],
+        "open": _num(latest["1. open"]),
+        "high": _num(latest["2. high"]),
+        "low": _num(latest["3. low"]),
+        "close": _num(latest["4. close"]),
+        "adj_close": _num(latest["5. adjusted close"]),
+        "volume": _num(latest["6. volume"]),
     }
 
 
 @tool
-def get_stock_news2(symbol: str):
+async def get_stock_news2(symbol: str):
     """
     Retrieve news sentiment feed for a stock.
 
@@ -178,15 +242,13 @@ def get_stock_news2(symbol: str):
     Returns:
         List of top 5 sentiment-scored news entries.
     """
-    data = requests.get(
-        f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&tickers={symbol}&apikey={ALPHA_KEY}"
-    ).json()
+    data = await _alpha_get(function="NEWS_SENTIMENT", tickers=symbol)
 
     return data["feed"][:5]
 
 
 @tool
-def company_inside_news(symbol: str, quarter: str = "2024Q1"):
+async def company_inside_news(symbol: str, quarter: str = "2024Q1"):
     """
     Retrieve earnings call transcript for a specific quarter.
 
@@ -200,13 +262,11 @@ def company_inside_news(symbol: str, quarter: str = "2024Q1"):
     Returns:
         Transcript JSON payload.
     """
-    return requests.get(
-        f"https://www.alphavantage.co/query?function=EARNINGS_CALL_TRANSCRIPT&symbol={symbol}&quarter={quarter}&apikey={ALPHA_KEY}"
-    ).json()
+    return await _alpha_get(function="EARNINGS_CALL_TRANSCRIPT", symbol=symbol, quarter=quarter)
 
 
 @tool
-def top_gainers():
+async def top_gainers():
     """
     Retrieve top gaining, losing, and most active stocks.
 
@@ -218,9 +278,7 @@ def top_gainers():
         - losers list
         - most active list
     """
-    d = requests.get(
-        f"https://www.alphavantage.co/query?function=TOP_GAINERS_LOSERS&apikey={ALPHA_KEY}"
-    ).json()
+    d = await _alpha_get(function="TOP_GAINERS_LOSERS")
 
     return {
         "gainers": d["top_gainers"][:5],
@@ -230,7 +288,7 @@ def top_gainers():
 
 
 @tool
-def company_overview(symbol: str):
+async def company_overview(symbol: str):
     """
     Retrieve company fundamental and valuation metrics.
 
@@ -249,23 +307,21 @@ def company_overview(symbol: str):
         - revenue
         - profit margin
     """
-    d = requests.get(
-        f"https://www.alphavantage.co/query?function=OVERVIEW&symbol={symbol}&apikey={ALPHA_KEY}"
-    ).json()
+    d = await _alpha_get(function="OVERVIEW", symbol=symbol)
 
     return {
         "name": d["Name"],
         "sector": d["Sector"],
-        "market_cap": d["MarketCapitalization"],
-        "pe": d["PERatio"],
-        "eps": d["EPS"],
-        "revenue": d["RevenueTTM"],
-        "profit_margin": d["ProfitMargin"],
+        "market_cap": _num(d["MarketCapitalization"]),
+        "pe": _num(d["PERatio"]),
+        "eps": _num(d["EPS"]),
+        "revenue": _num(d["RevenueTTM"]),
+        "profit_margin": _num(d["ProfitMargin"]),
     }
 
 
 @tool
-def annual_income_statement(symbol: str):
+async def annual_income_statement(symbol: str):
     """
     Retrieve annual and quarterly income statement reports.
 
@@ -279,9 +335,7 @@ def annual_income_statement(symbol: str):
         - top 3 annual reports
         - top 3 quarterly reports
     """
-    d = requests.get(
-        f"https://www.alphavantage.co/query?function=INCOME_STATEMENT&symbol={symbol}&apikey={ALPHA_KEY}"
-    ).json()
+    d = await _alpha_get(function="INCOME_STATEMENT", symbol=symbol)
 
     return {
         "annual": d["annualReports"][:3],
@@ -290,7 +344,7 @@ def annual_income_statement(symbol: str):
 
 
 @tool
-def earning_estimate(symbol: str):
+async def earning_estimate(symbol: str):
     """
     Retrieve analyst earnings estimates and projections.
 
@@ -302,13 +356,11 @@ def earning_estimate(symbol: str):
     Returns:
         Earnings estimate dataset JSON.
     """
-    return requests.get(
-        f"https://www.alphavantage.co/query?function=EARNINGS_ESTIMATES&symbol={symbol}&apikey={ALPHA_KEY}"
-    ).json()
+    return await _alpha_get(function="EARNINGS_ESTIMATES", symbol=symbol)
 
 
 @tool
-def future_expected_earning(symbol: str):
+async def future_expected_earning(symbol: str):
     """
     Retrieve upcoming earnings calendar events.
 
@@ -320,13 +372,11 @@ def future_expected_earning(symbol: str):
     Returns:
         Earnings calendar JSON data.
     """
-    return requests.get(
-        f"https://www.alphavantage.co/query?function=EARNINGS_CALENDAR&symbol={symbol}&horizon=3month&apikey={ALPHA_KEY}"
-    ).json()
+    return await _alpha_get(function="EARNINGS_CALENDAR", symbol=symbol, horizon="3month")
 
 
 @tool
-def get_gold_price():
+async def get_gold_price():
     """
     Retrieve current gold spot price in USD.
 
@@ -335,13 +385,11 @@ def get_gold_price():
     Returns:
         Dictionary with current exchange rate for XAU/USD.
     """
-    url = f"https://www.alphavantage.co/query?function=CURRENCY_EXCHANGE_RATE&from_currency=XAU&to_currency=USD&apikey={ALPHA_KEY}"
-    response = requests.get(url)
-    return response.json()
+    return await _alpha_get(function="CURRENCY_EXCHANGE_RATE", from_currency="XAU", to_currency="USD")
 
 
 @tool
-def get_silver_price():
+async def get_silver_price():
     """
     Retrieve current silver spot price in USD.
 
@@ -350,11 +398,9 @@ def get_silver_price():
     Returns:
         Dictionary with current exchange rate for XAG/USD.
     """
-    url = f"https://www.alphavantage.co/query?function=CURRENCY_EXCHANGE_RATE&from_currency=XAG&to_currency=USD&apikey={ALPHA_KEY}"
-    response = requests.get(url)
-    return response.json()
+    return await _alpha_get(function="CURRENCY_EXCHANGE_RATE", from_currency="XAG", to_currency="USD")
 @tool
-def get_stock_intraday_chart(symbol: str):
+async def get_stock_intraday_chart(symbol: str):
     """
     Retrieve intraday price series (5-minute interval) for charting.
 
@@ -369,81 +415,102 @@ def get_stock_intraday_chart(symbol: str):
         If API fails, returns empty list or generates synthetic data.
     """
     try:
-        url = f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={symbol}&interval=5min&outputsize=small&apikey={ALPHA_KEY}"
-        response = requests.get(url, timeout=10)
-        data = response.json()
+        data = await _alpha_get(
+            function="TIME_SERIES_INTRADAY", symbol=symbol, interval="5min", outputsize="small"
+        )
         
         # Check for API errors
         if "Error Message" in data:
-            print(f"[CHART] API Error for {symbol}: {data['Error Message']}", flush=True)
+            logger.error(f"[CHART] API Error for {symbol}: {data['Error Message']}")
             return []
         if "Information" in data:
-            print(f"[CHART] API Rate limit for {symbol}: {data['Information']}", flush=True)
+            logger.info(f"[CHART] API Rate limit for {symbol}: {data['Information']}")
             return []
         
         time_series = data.get("Time Series (5min)", {})
         if not time_series:
-            print(f"[CHART] No intraday data available for {symbol}", flush=True)
+            logger.info(f"[CHART] No intraday data available for {symbol}")
             return []
         
         chart_data = []
         
-        # Get last 50 data points and reverse to chronological order
-        for timestamp in sorted(time_series.keys())[-50:]:
+        # Select the newest 50 bars (nlargest beats a full sort), then sort
+        # just those back into chronological order for the chart
+        for timestamp in sorted(heapq.nlargest(50, time_series.keys())):
             try:
                 ohlc = time_series[timestamp]
                 chart_data.append({
-                    "time": timestamp.split(" ")[1][:5],  # HH:MM
+                    # Fixed "YYYY-MM-DD HH:MM:SS" format — slice HH:MM
+                    # directly rather than allocating split() fragments
+                    "time": timestamp[11:16],
                     "price": float(ohlc.get("4. close", ohlc.get("1. open", 0)))
                 })
             except (ValueError, KeyError) as e:
-                print(f"[CHART] Error parsing data point for {symbol}: {e}", flush=True)
+                logger.error(f"[CHART] Error parsing data point for {symbol}: {e}")
                 continue
         
-        print(f"[CHART] Retrieved {len(chart_data)} intraday points for {symbol}", flush=True)
+        logger.info(f"[CHART] Retrieved {len(chart_data)} intraday points for {symbol}")
         return chart_data
         
-    except requests.exceptions.Timeout:
-        print(f"[CHART] Timeout fetching data for {symbol}", flush=True)
+    except TimeoutError:
+        logger.info(f"[CHART] Timeout fetching data for {symbol}")
         return []
     except Exception as e:
-        print(f"[CHART] Error fetching intraday chart for {symbol}: {e}", flush=True)
+        logger.error(f"[CHART] Error fetching intraday chart for {symbol}: {e}")
         return []
 
 
-def fetch_stock_dashboard_data(symbol: str):
+async def fetch_stock_dashboard_data(symbol: str):
     """
     Directly fetches aggregated data for the dashboard widget.
     Bypasses LLM for performance and quota management.
     """
-    print(f">>> [DASHBOARD] Consolidating data for {symbol}...", flush=True)
-    
-    quote = {}
-    chart = []
-    overview = {}
-    
-    try:
-        quote = get_stock_price.invoke({"symbol": symbol})
-        print(f">>> [DASHBOARD] Price fetched: ${quote.get('current')}", flush=True)
-    except Exception as e:
-        print(f">>> [DASHBOARD] Price fetch failed: {e}", flush=True)
-        
-    try:
-        chart = get_stock_intraday_chart.invoke({"symbol": symbol})
-        print(f">>> [DASHBOARD] Chart fetched: {len(chart)} points", flush=True)
-    except Exception as e:
-        print(f">>> [DASHBOARD] Chart fetch failed: {e}", flush=True)
+    logger.info(f">>> [DASHBOARD] Consolidating data for {symbol}...")
+
+    def _cached(tool_fn):
+        # Dashboard polls hit the same TTL cache as agent tool calls, so
+        # slow-moving data (overview: 24h, daily bar: 5min) is fetched
+        # once per TTL instead of once per poll
+        return fetch_coalesced(
+            tool_fn.name, {"symbol": symbol},
+            lambda: tool_fn.ainvoke({"symbol": symbol}),
+        )
+
+    # The calls are independent, so fire them concurrently — total latency
+    # becomes the slowest round trip instead of the sum of all of them
+    quote, chart, overview, daily = await asyncio.gather(
+        _cached(get_stock_price),
+        _cached(get_stock_intraday_chart),
+        _cached(company_overview),
+        _cached(get_stock_price2),
+        return_exceptions=True,
+    )
+
+    if isinstance(quote, Exception):
+        logger.info(f">>> [DASHBOARD] Price fetch failed: {quote}")
+        quote = {}
+    else:
+        logger.info(f">>> [DASHBOARD] Price fetched: ${quote.get('current')}")
+
+    if isinstance(chart, Exception):
+        logger.info(f">>> [DASHBOARD] Chart fetch failed: {chart}")
         chart = []
-        
-    try:
-        overview = company_overview.invoke({"symbol": symbol})
-        print(f">>> [DASHBOARD] Overview fetched: {overview.get('name', 'N/A')}", flush=True)
-    except Exception as e:
-        print(f">>> [DASHBOARD] Overview fetch failed: {e}", flush=True)
+    else:
+        logger.info(f">>> [DASHBOARD] Chart fetched: {len(chart)} points")
+
+    if isinstance(overview, Exception):
+        logger.info(f">>> [DASHBOARD] Overview fetch failed: {overview}")
+        overview = {}
+    else:
+        logger.info(f">>> [DASHBOARD] Overview fetched: {overview.get('name', 'N/A')}")
+
+    if isinstance(daily, Exception):
+        logger.info(f">>> [DASHBOARD] Daily bar fetch failed: {daily}")
+        daily = {}
 
     result = {
         "symbol": symbol,
-        "company": overview.get("Name", symbol),
+        "company": overview.get("name", symbol),
         "price": quote.get("current"),
         "change": quote.get("current") - quote.get("prev_close") if quote.get("current") and quote.get("prev_close") else 0,
         "percent": ((quote.get("current") - quote.get("prev_close")) / quote.get("prev_close") * 100) if quote.get("current") and quote.get("prev_close") else 0,
@@ -452,17 +519,18 @@ def fetch_stock_dashboard_data(symbol: str):
         "high": quote.get("high"),
         "low": quote.get("low"),
         "prev_close": quote.get("prev_close"),
-        "volume": quote.get("volume"), 
-        "market_cap": overview.get("MarketCapitalization"),
+        # Finnhub's quote endpoint has no volume field; the daily bar does
+        "volume": daily.get("volume"),
+        "market_cap": overview.get("market_cap"),
         "chart": chart
     }
     
-    print(f">>> [DASHBOARD] Data consolidated for {symbol}, chart points: {len(chart)}", flush=True)
+    logger.info(f">>> [DASHBOARD] Data consolidated for {symbol}, chart points: {len(chart)}")
     return result
 
 
 @tool
-def predict_stock_signal(symbol: str):
+async def predict_stock_signal(symbol: str):
     """
     Generate a BUY/SELL/HOLD trading signal using simple technical analysis.
     
@@ -491,9 +559,9 @@ def predict_stock_signal(symbol: str):
     import pandas as pd
     
     try:
-        url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&outputsize=full&apikey={ALPHA_KEY}"
-        response = requests.get(url)
-        data = response.json()
+        # compact returns exactly the latest 100 bars — all this analysis
+        # uses — instead of the multi-MB 20-year series of outputsize=full
+        data = await _alpha_get(function="TIME_SERIES_DAILY", symbol=symbol, outputsize="compact")
         
         if "Error Message" in data or "Information" in data:
             return {
@@ -515,7 +583,7 @@ def predict_stock_signal(symbol: str):
                 "indicators": {}
             }
         
-        dates = sorted(time_series.keys(), reverse=True)[:100]
+        dates = heapq.nlargest(100, time_series.keys())
         prices = []
         closes_only = []
         
@@ -0,0 +1,51 @@
+"""Background cache warming for tracked symbols.
+
+Dashboard users watch a small, stable set of tickers; refreshing their
+quotes on a schedule means user-facing reads almost always hit the TTL
+cache instead of paying a live round trip. Tracked symbols come from the
+QUANTPILOT_WARM_SYMBOLS env var (comma-separated). Only Finnhub-backed
+quotes are pre-warmed — Finnhub allows 60 req/min, while AlphaVantage's
+25-requests/day quota is reserved for user-triggered fetches.
+"""
+
+import asyncio
+import logging
+import os
+
+from backend.ingestion.cache import fetch_coalesced
+from backend.ingestion.tool import get_stock_price
+
+logger = logging.getLogger(__name__)
+
+WARM_INTERVAL_SECONDS = 30
+MAX_CONCURRENT_WARMS = 5
+
+
+def _tracked_symbols():
+    raw = os.getenv("QUANTPILOT_WARM_SYMBOLS", "")
+    return [s.strip().upper() for s in raw.split(",") if s.strip()]
+
+
+async def _warm_quote(symbol: str, sem: asyncio.Semaphore):
+    async with sem:
+        try:
+            await fetch_coalesced(
+                "get_stock_price", {"symbol": symbol},
+                lambda: get_stock_price.ainvoke({"symbol": symbol}),
+            )
+        except Exception as e:
+            logger.warning(f"[WARM] Quote refresh failed for {symbol}: {e}")
+
+
+async def warm_cache_loop():
+    """Refresh tracked-symbol quotes every WARM_INTERVAL_SECONDS forever."""
+    symbols = _tracked_symbols()
+    if not symbols:
+        logger.info("[WARM] QUANTPILOT_WARM_SYMBOLS not set, cache warming disabled.")
+        return
+
+    logger.info(f"[WARM] Warming quotes for {len(symbols)} symbols every {WARM_INTERVAL_SECONDS}s.")
+    sem = asyncio.Semaphore(MAX_CONCURRENT_WARMS)
+    while True:
+        await asyncio.gather(*(_warm_quote(s, sem) for s in symbols))
+        await asyncio.sleep(WARM_INTERVAL_SECONDS)
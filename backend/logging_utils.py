@@ -0,0 +1,34 @@
+"""Non-blocking logging setup shared by the backend.
+
+Hot-path code used print(..., flush=True), which serializes on the stdout
+lock and forces a syscall per line under concurrent load. setup_logging()
+installs a QueueHandler on the root logger and drains it from a background
+QueueListener thread, so request paths only pay a queue put.
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_listener = None
+
+
+def setup_logging(level=logging.INFO):
+    """Install queue-backed logging; safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s %(message)s"
+    ))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()